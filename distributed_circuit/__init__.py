@@ -1 +1,2 @@
 from .dist_circuit import DistQuantumCircuit
+from .topology import NetworkTopology, EPRResourceIndex
@@ -0,0 +1,181 @@
+import hashlib
+import math
+import numbers
+
+import numpy as np
+
+from .gate_cache import definition_key, is_composite
+
+# Roles of the control and communication qubits of a remoteCx, its targets
+# coming next. remoteCx acting on a qubit in the same role commute, as controls
+# are diagonal and targets are flipped by X.
+REMOTE_CX_ROLES = ("control", None, None)
+
+
+def canonical_hash(circuit):
+    """Return a hash of a circuit that is independent of how it is written down.
+
+    The hash is computed in a single pass over the instructions. Each wire keeps
+    the digest of the last operation on it, and each operation is hashed with
+    the digests of its input wires, so operations on disjoint wires can come in
+    any order, as in the DAG of the circuit. Besides, ``remoteCx`` acting on a
+    qubit in the same role, as control or as target, are hashed as a set, and
+    the two qubits of an ``epr`` as an unordered pair. Bits are identified by
+    their position in the circuit, so that register names do not matter.
+
+    Memory use depends on the number of bits and on the number of distinct
+    custom gate definitions, not on the length of the circuit. The definition
+    of a custom gate is hashed once per structure, though each instance is read
+    to tell its structure.
+
+    Args:
+        circuit (QuantumCircuit): the circuit to hash.
+
+    Return:
+        str: the hexadecimal digest.
+    """
+    return _CanonicalHasher(circuit).run()
+
+
+def circuits_equivalent(circuit0, circuit1):
+    """Tell whether two circuits have the same canonical hash.
+
+    Circuits differing in size are told apart without hashing them.
+
+    Args:
+        circuit0 (QuantumCircuit): a circuit.
+        circuit1 (QuantumCircuit): another circuit.
+
+    Return:
+        bool: True if the circuits only differ in the order of commuting
+            operations and in the names of their registers.
+    """
+    if (circuit0.num_qubits != circuit1.num_qubits
+            or circuit0.num_clbits != circuit1.num_clbits
+            or len(circuit0._data) != len(circuit1._data)):
+        return False
+    return canonical_hash(circuit0) == canonical_hash(circuit1)
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _position(position):
+    return position.to_bytes(4, "little")
+
+
+def _param_token(param):
+    if isinstance(param, np.ndarray):
+        return param.tobytes().hex()
+    if isinstance(param, numbers.Real):
+        return repr(float(param))
+    if isinstance(param, numbers.Complex):
+        return repr(complex(param))
+    return str(param)
+
+
+def _phase_token(phase):
+    if isinstance(phase, numbers.Real):
+        return repr(float(phase) % (2 * math.pi))
+    return str(phase)
+
+
+class _CanonicalHasher:
+
+    def __init__(self, circuit):
+        self.circuit = circuit
+        self.qubit_indices = {qubit: index for index, qubit in enumerate(circuit.qubits)}
+        offset = len(self.qubit_indices)
+        self.clbit_indices = {clbit: offset + index for index, clbit in enumerate(circuit.clbits)}
+        num_wires = offset + len(self.clbit_indices)
+        self.state = [_digest(b"wire%d" % wire) + _position(0) for wire in range(num_wires)]
+        # Operations commuting on a wire are summed up until one in another role
+        self.group_role = [None] * num_wires
+        self.group_sum = [0] * num_wires
+        self.tokens = {}  # tokens of the instructions without parameters
+        self.definitions = {}  # structure -> digest of the definitions of composite instructions
+        self.last_composite = (None, None)  # the last composite instruction and its digest
+
+    def run(self):
+        for instruction, qargs, cargs in self.circuit._data:
+            self._hash_operation(instruction, qargs, cargs)
+        for wire in range(len(self.state)):
+            self._close_group(wire)
+        return hashlib.blake2b(
+            b"".join(self.state) + _phase_token(self.circuit.global_phase).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    def _hash_operation(self, instruction, qargs, cargs):
+        name = instruction.name
+        wires = [self.qubit_indices[qubit] for qubit in qargs]
+        if cargs:
+            wires += [self.clbit_indices[clbit] for clbit in cargs]
+        roles = None
+        if name == "remoteCx":
+            roles = REMOTE_CX_ROLES + ("target",) * (len(qargs) - 3) + (None,) * len(cargs)
+        token = self._token(instruction)
+        if instruction.condition is not None:
+            target, value = instruction.condition
+            bits = [target] if target in self.clbit_indices else list(target)
+            wires += [self.clbit_indices[clbit] for clbit in bits]
+            if roles is not None:
+                roles += (None,) * len(bits)
+            token += b"?%d" % value
+        if roles is None:
+            roles = (None,) * len(wires)
+
+        state, group_role = self.state, self.group_role
+        inputs = []
+        for wire, role in zip(wires, roles):
+            if group_role[wire] != role:
+                self._close_group(wire)
+            inputs.append(state[wire])
+        if name == "epr":
+            # Both halves of a Bell pair are alike
+            inputs.sort()
+        digest = _digest(token + b"".join(inputs))
+
+        # The state of each output wire is the digest followed by its position
+        for output, (wire, role) in enumerate(zip(wires, roles)):
+            wire_state = digest + _position(0 if name == "epr" else output)
+            if role is None:
+                state[wire] = wire_state
+            else:
+                group_role[wire] = role
+                self.group_sum[wire] = (self.group_sum[wire]
+                                        + int.from_bytes(_digest(wire_state), "little")) % (1 << 128)
+
+    def _close_group(self, wire):
+        role = self.group_role[wire]
+        if role is None:
+            return
+        self.state[wire] = _digest(self.state[wire] + role.encode()
+                                   + self.group_sum[wire].to_bytes(16, "little")) + _position(0)
+        self.group_role[wire] = None
+        self.group_sum[wire] = 0
+
+    def _token(self, instruction):
+        composite = is_composite(instruction)
+        if not instruction.params and not composite:
+            key = (instruction.name, instruction.num_qubits, instruction.num_clbits)
+            token = self.tokens.get(key)
+            if token is None:
+                token = self.tokens[key] = "{}(){},{}".format(*key).encode()
+            return token
+        token = "{}({}){},{}".format(
+            instruction.name, ",".join(_param_token(param) for param in instruction.params),
+            instruction.num_qubits, instruction.num_clbits,
+        ).encode()
+        if composite and instruction.definition is not None:
+            # Instances of a composite instruction often come in a row
+            if self.last_composite[0] is not instruction:
+                key = definition_key(instruction)
+                digest = self.definitions.get(key)
+                if digest is None:
+                    digest = self.definitions[key] = canonical_hash(
+                        instruction.definition).encode()
+                self.last_composite = (instruction, digest)
+            token += self.last_composite[1]
+        return token
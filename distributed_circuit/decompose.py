@@ -0,0 +1,76 @@
+from qiskit.tools.parallel import CPU_COUNT, parallel_map
+
+from .gate_cache import ExpansionCache, definition_key, map_condition
+
+# Number of distinct instructions from which expansions are computed in parallel
+PARALLEL_THRESHOLD = 1000
+
+
+def decompose(circuit, levels=1, stop_at=None):
+    """Replace the instructions of a circuit by their definitions.
+
+    Instructions are expanded recursively, ``levels`` times or until the
+    expansion only contains instructions without definition or named in
+    ``stop_at``, such as basis gates and the distributed primitives. The
+    flattened expansion of each distinct instruction, identified by name,
+    parameters and definition, is computed once and shared by its occurrences.
+
+    Expansions are independent of the qubits an instruction acts on, so on large
+    circuits the distinct instructions are split among processes.
+
+    Args:
+        circuit (DistQuantumCircuit): the circuit to decompose.
+        levels (int): the number of levels to expand, until a fixed point if None.
+        stop_at (set(str)): names of the instructions to keep as they are.
+
+    Return:
+        DistQuantumCircuit: the decomposed circuit.
+    """
+    expansions = ExpansionCache(stop_at)
+
+    def expand(instruction):
+        return expansions.flatten(instruction, levels)
+
+    if CPU_COUNT > 1 and len(circuit._data) >= PARALLEL_THRESHOLD:
+        memo = {}
+        distinct = {}
+        for instruction, _, _ in circuit._data:
+            if instruction.name not in expansions.stop_at:
+                distinct.setdefault(definition_key(instruction, memo), instruction)
+        if len(distinct) >= PARALLEL_THRESHOLD:
+            instructions = list(distinct.values())
+            size = -(-len(instructions) // CPU_COUNT)
+            chunks = [instructions[start:start + size]
+                      for start in range(0, len(instructions), size)]
+            results = parallel_map(_flatten_all, chunks, task_args=(levels, stop_at))
+            flattened = dict(zip(distinct, (expansion for result in results
+                                            for expansion in result)))
+
+            def expand(instruction):  # pylint: disable=function-redefined
+                return flattened.get(definition_key(instruction, memo))
+
+    decomposed = circuit.copy_empty_like()
+    for instruction, qargs, cargs in circuit._data:
+        expansion = expand(instruction)
+        if expansion is None:
+            decomposed._append(instruction, qargs, cargs)
+            continue
+        rule, global_phase = expansion
+        decomposed.global_phase += global_phase
+        condition = instruction.condition
+        for sub_instruction, qubit_indices, clbit_indices, sub_condition in rule:
+            # The instructions of the expansion are those of the definition
+            sub_instruction = sub_instruction.copy()
+            if condition is not None:
+                sub_instruction.condition = condition
+            elif sub_condition is not None:
+                sub_instruction.condition = map_condition(sub_condition, cargs, decomposed.cregs)
+            decomposed._append(sub_instruction,
+                               [qargs[index] for index in qubit_indices],
+                               [cargs[index] for index in clbit_indices])
+    return decomposed
+
+
+def _flatten_all(instructions, levels, stop_at):
+    expansions = ExpansionCache(stop_at)
+    return [expansions.flatten(instruction, levels) for instruction in instructions]
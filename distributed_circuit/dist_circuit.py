@@ -3,19 +3,82 @@ import warnings
 import pygments
 from pygments.formatters.terminal256 import Terminal256Formatter
 from qiskit import QuantumRegister
-from qiskit.circuit import Gate, Instruction
-from qiskit.circuit.quantumcircuit import QuantumCircuit, HAS_PYGMENTS
+from qiskit.circuit.quantumcircuit import (QuantumCircuit, HAS_PYGMENTS,
+                                          _get_composite_circuit_qasm_from_instruction)
+from qiskit.circuit.quantumcircuitdata import QuantumCircuitData
 from qiskit.exceptions import MissingOptionalLibraryError
 from qiskit.qasm import OpenQASMLexer, QasmTerminalStyle, QasmError
 
 from dqc_parser import ast_to_dag
 from .dist_qasm import DistQasm
+from .gate_cache import definition_key, is_composite
+from .topology import EPRResourceIndex
 
 
 class DistQuantumCircuit(QuantumCircuit):
 
-    def __init__(self, *regs, name=None, global_phase=0, metadata=None):
+    def __init__(self, *regs, name=None, global_phase=0, metadata=None, topology=None):
+        self._topology = None
+        self._resource_index = None
         super().__init__(*regs, name=name, global_phase=global_phase, metadata=metadata)
+        self.topology = topology
+
+    @property
+    def topology(self):
+        """Return the network topology the circuit runs on, None if unknown."""
+        return self._topology
+
+    @topology.setter
+    def topology(self, topology):
+        """Set the network topology and index the circuit against it.
+        Args:
+          topology (NetworkTopology): the network, or None
+        """
+        self._topology = topology
+        self._resource_index = None
+        if topology is not None:
+            self._resource_index = EPRResourceIndex(topology)
+            self._reindex()
+
+    @property
+    def resource_index(self):
+        """Return the EPR resource index of the circuit, None without a topology."""
+        return self._resource_index
+
+    @property
+    def data(self):
+        """Return the circuit data, keeping the resource index up to date when
+        it is modified."""
+        return _IndexedCircuitData(self)
+
+    @data.setter
+    def data(self, data_input):
+        if self._resource_index is not None:
+            self._resource_index.clear()
+        QuantumCircuit.data.fset(self, data_input)
+
+    def _append(self, instruction, qargs=None, cargs=None):
+        appended = super()._append(instruction, qargs, cargs)
+        if self._resource_index is not None:
+            if qargs is None:
+                # A CircuitInstruction
+                self._resource_index.add(instruction.operation, instruction.qubits)
+            else:
+                self._resource_index.add(instruction, qargs)
+        return appended
+
+    def _reindex(self):
+        """Rebuild the resource index from the instructions of the circuit."""
+        if self._resource_index is not None:
+            self._resource_index.clear()
+            for instruction, qargs, _ in self._data:
+                self._resource_index.add(instruction, qargs)
+
+    def copy(self, name=None):
+        cpy = super().copy(name=name)
+        # Index the copied instructions rather than sharing the index
+        cpy.topology = self.topology
+        return cpy
 
     @staticmethod
     def from_qasm_file(path):
@@ -39,6 +102,21 @@ class DistQuantumCircuit(QuantumCircuit):
         qasm = DistQasm(data=qasm_str)
         return _circuit_from_qasm(qasm)
 
+    def copy_empty_like(self, name=None):
+        """Return a circuit with the same bits and registers but no instructions.
+        Args:
+          name (str): name to be given to the copy. If None, then the name stays the same
+        Return:
+          DistQuantumCircuit: An empty circuit sharing the bits of this one
+        """
+        cpy = DistQuantumCircuit(name=name or self.name, global_phase=self.global_phase,
+                                 metadata=self.metadata)
+        cpy.add_bits(self.qubits + self.clbits)
+        cpy.add_register(*self.qregs, *self.cregs)
+        cpy.calibrations = self.calibrations
+        cpy.topology = self.topology
+        return cpy
+
     def etnswap(self, *qargs):
         from .instructions import EntSwapInstr
 
@@ -81,7 +159,7 @@ class DistQuantumCircuit(QuantumCircuit):
             else:
                 qubits.append(qarg)
 
-        return self.append(RemoteCxInstr(), qubits, [])
+        return self.append(RemoteCxInstr(len(qubits) - 3), qubits, [])
 
     def epr(self, *qargs):
         from .instructions import EPRInstr
@@ -123,8 +201,6 @@ class DistQuantumCircuit(QuantumCircuit):
                 ``True``.
             QasmError: If circuit has free parameters.
         """
-        from qiskit.circuit.controlledgate import ControlledGate
-
         if self.num_parameters > 0:
             raise QasmError("Cannot represent circuits with unbound parameters in OpenQASM 2.")
 
@@ -177,7 +253,10 @@ class DistQuantumCircuit(QuantumCircuit):
             "entswap",
         ]
 
-        existing_composite_circuits = []
+        # Composite instructions already defined, by structure, with the name
+        # their definition was written with
+        existing_composite_circuits = {}
+        definition_memo = {}
 
         string_temp = self.header + "\n"
         string_temp += self.extension_lib + "\n"
@@ -267,39 +346,40 @@ class DistQuantumCircuit(QuantumCircuit):
                 string_temp += temp
                 # print(temp)
 
-            elif (
-                    type(instruction)
-                    in [
-                        Gate,
-                        Instruction,
-                    ]
-                    or (isinstance(instruction, ControlledGate) and instruction._open_ctrl)
-            ):
-                if instruction not in existing_composite_circuits:
-                    if instruction.name in existing_gate_names:
-                        old_name = instruction.name
-                        instruction.name += "_" + str(id(instruction))
+            elif is_composite(instruction):
+                key = definition_key(instruction, definition_memo)
+                if key not in existing_composite_circuits:
+                    name = instruction.name
+                    definition_instruction = instruction
+                    if name in existing_gate_names:
+                        name += "_" + str(id(instruction))
+                        # Rename a copy, so that another call writes the same names
+                        definition_instruction = instruction.copy(name=name)
 
                         warnings.warn(
                             "A gate named {} already exists. "
                             "We have renamed "
-                            "your gate to {}".format(old_name, instruction.name)
+                            "your gate to {}".format(instruction.name, name)
                         )
 
                     # Get qasm of composite circuit
-                    qasm_string = self._get_composite_circuit_qasm_from_instruction(instruction)
+                    qasm_string = _get_composite_circuit_qasm_from_instruction(
+                        definition_instruction)
 
                     # Insert composite circuit qasm definition right after header and extension lib
                     string_temp = string_temp.replace(
                         self.extension_lib, f"{self.extension_lib}\n{qasm_string}"
                     )
 
-                    existing_composite_circuits.append(instruction)
-                    existing_gate_names.append(instruction.name)
+                    existing_composite_circuits[key] = name
+                    existing_gate_names.append(name)
 
-                # Insert qasm representation of the original instruction
+                # Insert qasm representation of the original instruction, under
+                # the name its definition was written with
+                call = instruction.qasm()
+                call = existing_composite_circuits[key] + call[len(instruction.name):]
                 string_temp += "{} {};\n".format(
-                    instruction.qasm(),
+                    call,
                     ",".join([bit_labels[j] for j in qargs + cargs]),
                 )
             else:
@@ -333,20 +413,121 @@ class DistQuantumCircuit(QuantumCircuit):
         else:
             return string_temp
 
-    def decompose(self):
-        """Call a decomposition pass on this circuit,
-        to decompose one level (shallow decompose).
+    def canonical_hash(self):
+        """Return a hash of this circuit invariant to the order of commuting
+        operations, including ``epr`` and ``remoteCx``, and to register names.
+
+        Returns:
+            str: the hexadecimal digest
+        """
+        from .canonical import canonical_hash
+        return canonical_hash(self)
+
+    def equivalent(self, other):
+        """Tell whether ``other`` is this circuit up to the order of commuting
+        operations and the names of registers, comparing canonical hashes.
+
+        Args:
+            other (QuantumCircuit): the circuit to compare with.
+
+        Returns:
+            bool: True if both circuits have the same canonical hash
+        """
+        from .canonical import circuits_equivalent
+        return circuits_equivalent(self, other)
+
+    def split_by_node(self, qubit_to_node=None):
+        """Split this circuit into one local circuit per QPU.
+
+        ``epr``, ``remoteCx`` and ``entswap`` are replaced by their local halves,
+        with ``send`` and ``recv`` annotations for the classical messages.
+
+        Args:
+            qubit_to_node (dict): the QPU holding each qubit of the circuit.
+                Taken from the topology if None.
+
+        Returns:
+            dict: the local QuantumCircuit of each node
+        """
+        from .split import split_by_node
+        return split_by_node(self, qubit_to_node)
+
+    def transpile_by_node(self, qubit_to_node=None, **transpile_args):
+        """Split this circuit per QPU and transpile the local circuits in parallel.
+
+        The local circuits are handed to ``qiskit.transpile`` together, which
+        spreads them over a process pool. The local halves of remote operations
+        are added to ``basis_gates``, so they are kept as they are.
+
+        Args:
+            qubit_to_node (dict): the QPU holding each qubit of the circuit.
+                Taken from the topology if None.
+            transpile_args: arguments of ``qiskit.transpile``. Per-node values
+                are given as lists, in the order of the nodes returned by
+                :meth:`split_by_node`.
+
+        Returns:
+            dict: the transpiled local QuantumCircuit of each node
+        """
+        from qiskit import transpile
+        from .instructions import LOCAL_PRIMITIVES
+
+        local = self.split_by_node(qubit_to_node)
+        if transpile_args.get("basis_gates") is not None:
+            transpile_args["basis_gates"] = list(transpile_args["basis_gates"]) + LOCAL_PRIMITIVES
+        circuits = transpile(list(local.values()), **transpile_args)
+        return dict(zip(local, circuits))
+
+    def decompose(self, levels=1, stop_at=None):
+        """Decompose this circuit, one level deep by default (shallow decompose).
+
+        Every instruction with a definition is replaced by it, as the
+        ``Decompose`` pass would do, repeatedly over ``levels`` levels. The
+        expansion of each distinct instruction, identified by name, parameters
+        and definition, is computed once.
+
+        Args:
+            levels (int): the number of levels to decompose. Decompose until
+                nothing but instructions without definition or named in
+                ``stop_at`` are left if None.
+            stop_at (set(str)): names of the instructions to keep, e.g. basis
+                gates and ``epr``, ``remoteCx`` and ``entswap``.
 
         Returns:
-            QuantumCircuit: a circuit one level decomposed
+            DistQuantumCircuit: the decomposed circuit
         """
-        # pylint: disable=cyclic-import
-        from qiskit.transpiler.passes.basis.decompose import Decompose
-        from qiskit.converters.circuit_to_dag import circuit_to_dag
-        from dqc_parser.dag_to_dist_circuit import dag_to_dist_circuit
-        pass_ = Decompose()
-        decomposed_dag = pass_.run(circuit_to_dag(self))
-        return dag_to_dist_circuit(decomposed_dag)
+        from .decompose import decompose
+        return decompose(self, levels, stop_at)
+
+
+class _IndexedCircuitData(QuantumCircuitData):
+    """Circuit data keeping the resource index of the circuit up to date."""
+
+    def __setitem__(self, key, value):
+        resource_index = self._circuit.resource_index
+        if resource_index is None:
+            super().__setitem__(key, value)
+            return
+        replaced = self._circuit._data[key]
+        super().__setitem__(key, value)
+        # insert() sets a None placeholder
+        if replaced is not None:
+            instruction, qargs, _ = replaced
+            resource_index.remove(instruction, qargs)
+        instruction, qargs, _ = self._circuit._data[key]
+        resource_index.add(instruction, qargs)
+
+    def __delitem__(self, i):
+        resource_index = self._circuit.resource_index
+        if resource_index is not None:
+            removed = self._circuit._data[i]
+            for instruction, qargs, _ in (removed if isinstance(i, slice) else [removed]):
+                resource_index.remove(instruction, qargs)
+        super().__delitem__(i)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._circuit._reindex()
 
 
 def _circuit_from_qasm(qasm):
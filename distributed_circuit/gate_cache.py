@@ -0,0 +1,201 @@
+import numpy as np
+
+from qiskit import QiskitError
+from qiskit.circuit import ControlledGate, Gate, Instruction
+
+
+def is_composite(instruction):
+    """Tell whether ``instruction`` is a custom gate or instruction, whose
+    definition has to be written out in OpenQASM."""
+    return (type(instruction) in (Gate, Instruction)
+            or (isinstance(instruction, ControlledGate) and instruction._open_ctrl))
+
+
+def definition_key(instruction, memo=None):
+    """Return a hashable key identifying ``instruction`` by its structure.
+
+    Instructions with the same key have the same name, parameters and
+    definition. The definition of library gates is implied by their class, so
+    only custom gates and instructions have their body hashed, recursively.
+    The condition of ``instruction`` itself is left out.
+
+    Args:
+        instruction (Instruction): the instruction to identify.
+        memo (dict): keys already computed, by instruction id. Instructions of a
+            circuit are often shared, so one memo should be used per circuit.
+
+    Return:
+        tuple: the structural key.
+    """
+    if memo is None:
+        memo = {}
+    cached = memo.get(id(instruction))
+    if cached is not None:
+        return cached[1]
+
+    key = (type(instruction), instruction.name, instruction.num_qubits,
+           instruction.num_clbits, tuple(_param_key(param) for param in instruction.params))
+    if isinstance(instruction, ControlledGate):
+        key += (instruction.ctrl_state, definition_key(instruction.base_gate, memo))
+    if is_composite(instruction) and instruction.definition is not None:
+        key += (_body_key(instruction.definition, memo),)
+    # Keep the instruction alive so that its id is not reused during the memo's life
+    memo[id(instruction)] = (instruction, key)
+    return key
+
+
+def _body_key(definition, memo):
+    qubit_indices = {qubit: index for index, qubit in enumerate(definition.qubits)}
+    clbit_indices = {clbit: index for index, clbit in enumerate(definition.clbits)}
+    body = [_param_key(definition.global_phase)]
+    for sub_instruction, qargs, cargs in definition.data:
+        condition = sub_instruction.condition
+        if condition is not None:
+            condition = (_condition_key(condition[0], clbit_indices), condition[1])
+        body.append((definition_key(sub_instruction, memo),
+                     tuple(qubit_indices[qubit] for qubit in qargs),
+                     tuple(clbit_indices[clbit] for clbit in cargs),
+                     condition))
+    return tuple(body)
+
+
+def _condition_key(target, clbit_indices):
+    if target in clbit_indices:
+        return clbit_indices[target]
+    return tuple(clbit_indices[clbit] for clbit in target)
+
+
+def map_condition(condition, clbits, cregs):
+    """Return a condition given by clbit positions on the bits ``clbits``.
+
+    As in ``DAGCircuit.substitute_node_with_dag``, a condition on a register
+    is moved to the register of ``cregs`` holding the mapped bits, its value
+    being rewritten for the positions of the bits in that register.
+
+    Args:
+        condition (tuple): the position of the clbit, or the positions of the
+            bits of the register, and the value.
+        clbits (list(Clbit)): the bits the positions refer to.
+        cregs (list(ClassicalRegister)): the registers of the target circuit.
+
+    Return:
+        tuple: the condition on a clbit or on a register of ``cregs``.
+
+    Raises:
+        QiskitError: if the bits of a register condition are not all in one
+            register of ``cregs``.
+    """
+    target, value = condition
+    if isinstance(target, int):
+        return (clbits[target], value)
+    bits = [clbits[position] for position in target]
+    for creg in cregs:
+        creg_bits = list(creg)
+        if bits[0] in creg_bits:
+            if all(bit in creg_bits for bit in bits):
+                return (creg, sum(1 << creg_bits.index(bit)
+                                  for index, bit in enumerate(bits) if value >> index & 1))
+            break
+    raise QiskitError("The bits of conditional register {} are not in one register".format(
+        target))
+
+
+def _param_key(param):
+    if isinstance(param, np.ndarray):
+        return (param.shape, param.dtype.str, param.tobytes())
+    try:
+        hash(param)
+    except TypeError:
+        return str(param)
+    return param
+
+
+class ExpansionCache:
+    """Definitions of instructions, computed once per structure.
+
+    Each definition is stored as a list of ``(instruction, qubit indices,
+    clbit indices, condition)``, the indices being positions in the arguments
+    of the expanded instruction, together with its global phase. The condition
+    of each instruction is given by clbit positions as well, to be mapped with
+    :func:`map_condition`. Expansions over several levels are cached as well,
+    already flattened.
+
+    Args:
+        stop_at (set(str)): names of the instructions never to expand.
+    """
+
+    def __init__(self, stop_at=None):
+        self.stop_at = set(stop_at or ())
+        self._memo = {}
+        self._expansions = {}
+        self._flattened = {}
+
+    def expansion(self, instruction):
+        """Return the expansion of ``instruction``, None if it has no definition."""
+        key = definition_key(instruction, self._memo)
+        if key in self._expansions:
+            return self._expansions[key]
+        definition = instruction.definition
+        expansion = None
+        if definition is not None:
+            qubit_indices = {qubit: index for index, qubit in enumerate(definition.qubits)}
+            clbit_indices = {clbit: index for index, clbit in enumerate(definition.clbits)}
+            rule = []
+            for sub_instruction, qargs, cargs in definition.data:
+                condition = sub_instruction.condition
+                if condition is not None:
+                    condition = (_condition_key(condition[0], clbit_indices), condition[1])
+                rule.append((sub_instruction,
+                             [qubit_indices[qubit] for qubit in qargs],
+                             [clbit_indices[clbit] for clbit in cargs],
+                             condition))
+            expansion = (rule, definition.global_phase)
+        self._expansions[key] = expansion
+        return expansion
+
+    def flatten(self, instruction, levels=1):
+        """Return the expansion of ``instruction`` over ``levels`` levels.
+
+        Args:
+            instruction (Instruction): the instruction to expand.
+            levels (int): the number of levels to expand, until no instruction
+                can be expanded any further if None.
+
+        Return:
+            tuple(list, float) or None: the expansion and its global phase, or
+                None if ``instruction`` is not to be expanded.
+        """
+        if levels == 0 or instruction.name in self.stop_at:
+            return None
+        key = (definition_key(instruction, self._memo), levels)
+        if key in self._flattened:
+            return self._flattened[key]
+        expansion = self.expansion(instruction)
+        if expansion is not None and levels != 1:
+            rule, global_phase = expansion
+            flat = []
+            for sub_instruction, qubit_indices, clbit_indices, condition in rule:
+                sub_expansion = self.flatten(sub_instruction, None if levels is None else levels - 1)
+                if sub_expansion is None:
+                    flat.append((sub_instruction, qubit_indices, clbit_indices, condition))
+                    continue
+                sub_rule, sub_phase = sub_expansion
+                global_phase += sub_phase
+                for leaf, leaf_qubits, leaf_clbits, leaf_condition in sub_rule:
+                    # The condition of an expanded instruction applies to its whole expansion
+                    if condition is not None:
+                        leaf_condition = condition
+                    elif leaf_condition is not None:
+                        leaf_target, leaf_value = leaf_condition
+                        if isinstance(leaf_target, int):
+                            leaf_target = clbit_indices[leaf_target]
+                        else:
+                            leaf_target = tuple(clbit_indices[index] for index in leaf_target)
+                        leaf_condition = (leaf_target, leaf_value)
+                    flat.append((leaf,
+                                 [qubit_indices[index] for index in leaf_qubits],
+                                 [clbit_indices[index] for index in leaf_clbits],
+                                 leaf_condition))
+            expansion = (flat, global_phase)
+        self._flattened[key] = expansion
+        return expansion
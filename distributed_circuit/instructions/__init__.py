@@ -1,3 +1,4 @@
 from .entswap import *
 from .remote_cx import *
 from .epr import *
+from .local import *
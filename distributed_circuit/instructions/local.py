@@ -0,0 +1,35 @@
+from qiskit.circuit import Instruction
+
+# Names of the instructions local circuits are left with after a split
+LOCAL_PRIMITIVES = ["epr_half", "send", "recv"]
+
+
+class EPRHalfInstr(Instruction):
+
+    # Directives are kept in place by the transpiler optimizations
+    _directive = True
+
+    def __init__(self, peer):
+        """Create new epr_half instruction, the local half of an EPR pair shared with ``peer``."""
+        super().__init__("epr_half", 1, 0, [])
+        self.label = 'EPR<->{}'.format(peer)
+
+
+class SendInstr(Instruction):
+
+    _directive = True
+
+    def __init__(self, peer):
+        """Create new send instruction, sending a classical bit to ``peer``."""
+        super().__init__("send", 0, 1, [])
+        self.label = 'Send->{}'.format(peer)
+
+
+class RecvInstr(Instruction):
+
+    _directive = True
+
+    def __init__(self, peer):
+        """Create new recv instruction, receiving a classical bit from ``peer``."""
+        super().__init__("recv", 0, 1, [])
+        self.label = 'Recv<-{}'.format(peer)
@@ -10,14 +10,18 @@ class RemoteCxNode(Node):
 
     def qasm(self):
         """Return the corresponding OPENQASM string."""
-        return "remoteCx " + self.children[0].qasm() + ";"
+        return "remoteCx " + ",".join(child.qasm() for child in self.children) + ";"
 
 
 class RemoteCxInstr(Instruction):
 
     # _directive = True
 
-    def __init__(self):
-        """Create new remoteCx instruction."""
-        super().__init__("remoteCx", 4, 0, [])
+    def __init__(self, num_targets=1):
+        """Create new remoteCx instruction.
+
+        Qubits are ordered as control, the two halves of the EPR pair, then
+        the targets. More than one target shares a single cat-entanglement.
+        """
+        super().__init__("remoteCx", 3 + num_targets, 0, [])
         self.label = 'RemoteCx'
@@ -0,0 +1,4 @@
+from .comm_allocation import allocate_comm_qubits
+from .dead_entanglement import eliminate_dead_entanglement
+from .entswap_balancing import SwapLatencyModel, balance_entswap
+from .remote_cx_aggregation import aggregate_remote_cx
@@ -0,0 +1,150 @@
+import heapq
+
+from qiskit import QiskitError
+from qiskit.circuit import Reset
+
+
+def allocate_comm_qubits(circuit, topology=None, max_comm_qubits=None):
+    """Pack the communication qubits of a circuit onto as few qubits as possible.
+
+    The live range of a communication qubit runs from the ``epr`` that prepares
+    it to the last operation using it before the next ``epr``, typically the
+    ``remoteCx`` or ``entswap`` consuming the pair and the measurement or reset
+    that follow. Live ranges are assigned to the communication qubits of their
+    node by scanning them in order of start, always reusing a free qubit when
+    there is one, which colors the interval graph with the fewest qubits. A
+    reset is inserted when a qubit is reused without having been reset.
+
+    With ``max_comm_qubits``, a node has at most that many communication qubits.
+    An ``epr`` on such a node is then delayed until right before its pair is
+    first used, so that a pair only holds its qubits while it is in use, which
+    serializes EPR generation. Pairs that are never used come last.
+
+    Args:
+        circuit (DistQuantumCircuit): the circuit to optimize.
+        topology (NetworkTopology): the network with the communication qubits of
+            each node. Taken from the circuit if None.
+        max_comm_qubits (int or dict): the size of the buffer of every node, or
+            of each node. Unbounded if None.
+
+    Return:
+        tuple(DistQuantumCircuit, dict): the optimized circuit, and the number of
+            communication qubits used by each node.
+
+    Raises:
+        QiskitError: if there is no topology, or a buffer is too small for the
+            pairs in use at once.
+    """
+    if topology is None:
+        topology = circuit.topology
+    if topology is None:
+        raise QiskitError("The circuit has no topology, the communication qubits must be given")
+    return _CommAllocator(circuit, topology, max_comm_qubits).run()
+
+
+class _CommAllocator:
+
+    def __init__(self, circuit, topology, max_comm_qubits):
+        self.circuit = circuit
+        self.topology = topology
+        self.physical = {}  # node -> qubits the buffer is made of
+        self.free = {}  # node -> heap of indices of free qubits in the buffer
+        self.bounded = set()  # nodes with a bounded buffer
+        for node, qubits in topology.comm_qubits.items():
+            size = max_comm_qubits
+            if isinstance(max_comm_qubits, dict):
+                size = max_comm_qubits.get(node)
+            if size is not None:
+                self.bounded.add(node)
+            self.physical[node] = qubits[:size] if size is not None else list(qubits)
+            self.free[node] = list(range(len(self.physical[node])))
+        self.used = {node: 0 for node in self.physical}
+        self.dirty = set()  # physical qubits to reset before reuse
+        self.pending = {}  # index -> delayed epr instruction
+        self.index = 0
+        self.allocated = circuit.copy_empty_like()
+
+    def run(self):
+        data = list(self.circuit.data)
+        ranges = self._live_ranges(data)
+        ending = {}  # index -> ranges ending there
+        for index, live_ranges in enumerate(ranges):
+            for live_range in live_ranges.values():
+                if live_range["start"] == index:
+                    ending.setdefault(live_range["end"], []).append(live_range)
+
+        for self.index, (instruction, qargs, cargs) in enumerate(data):
+            live_ranges = ranges[self.index]
+            if instruction.name == "epr" and any(live_range["node"] in self.bounded
+                                                 for live_range in live_ranges.values()):
+                self.pending[self.index] = (instruction, qargs, cargs, live_ranges)
+                for live_range in live_ranges.values():
+                    live_range["epr"] = self.index
+            else:
+                for live_range in live_ranges.values():
+                    if "epr" in live_range:
+                        self._flush(live_range)
+                self._emit(instruction, qargs, cargs, live_ranges)
+
+            for live_range in ending.get(self.index, ()):
+                if "epr" not in live_range:
+                    self._release(live_range)
+
+        for instruction, qargs, cargs, live_ranges in self.pending.values():
+            self._emit(instruction, qargs, cargs, live_ranges)
+            for live_range in live_ranges.values():
+                self._release(live_range)
+        return self.allocated, self.used
+
+    def _live_ranges(self, data):
+        """Return, for each instruction, the live range of each communication
+        qubit it acts on."""
+        ranges = []
+        current = {}
+        for index, (instruction, qargs, _) in enumerate(data):
+            live_ranges = {}
+            for qubit in qargs:
+                if not self.topology.is_comm_qubit(qubit):
+                    continue
+                live_range = current.get(qubit)
+                if live_range is None or instruction.name == "epr":
+                    live_range = {"node": self.topology.node_of(qubit), "start": index}
+                    current[qubit] = live_range
+                live_range["end"] = index
+                live_range["reset"] = instruction.name == "reset"
+                live_ranges[qubit] = live_range
+            ranges.append(live_ranges)
+        return ranges
+
+    def _allocate(self, live_range):
+        node = live_range["node"]
+        if not self.free[node]:
+            raise QiskitError("The communication buffer of node {} is full".format(node))
+        index = heapq.heappop(self.free[node])
+        self.used[node] = max(self.used[node], index + 1)
+        qubit = self.physical[node][index]
+        live_range["qubit"] = qubit
+        if qubit in self.dirty:
+            self.allocated._append(Reset(), [qubit], [])
+            self.dirty.discard(qubit)
+
+    def _release(self, live_range):
+        node, qubit = live_range["node"], live_range["qubit"]
+        heapq.heappush(self.free[node], self.physical[node].index(qubit))
+        if not live_range["reset"]:
+            self.dirty.add(qubit)
+
+    def _emit(self, instruction, qargs, cargs, live_ranges):
+        for live_range in live_ranges.values():
+            if "qubit" not in live_range:
+                self._allocate(live_range)
+        qubits = [live_ranges[qubit]["qubit"] if qubit in live_ranges else qubit
+                  for qubit in qargs]
+        self.allocated._append(instruction, qubits, cargs)
+
+    def _flush(self, live_range):
+        """Emit the delayed epr preparing ``live_range``."""
+        instruction, qargs, cargs, live_ranges = self.pending.pop(live_range["epr"])
+        self._emit(instruction, qargs, cargs, live_ranges)
+        for pending_range in live_ranges.values():
+            del pending_range["epr"]
@@ -0,0 +1,91 @@
+def eliminate_dead_entanglement(dag, epr_time=1.0):
+    """Remove the EPR pairs that no operation ever consumes.
+
+    Each ``epr`` opens a pair whose liveness is followed through the ``entswap``
+    chains it takes part in: swapping pairs end to end fuses them into a single
+    pair between the outer qubits. A pair is live as soon as any other operation,
+    such as the ``remoteCx`` consuming it, acts on one of its qubits. A pair whose
+    qubits are only overwritten by a later ``epr`` or ``reset`` is dead, and so is
+    a pair still unused at the end of the circuit. Dead pairs are removed together
+    with the ``entswap`` instructions that built them.
+
+    The DAG is walked once in topological order, so the pass is linear in the
+    size of the circuit.
+
+    Args:
+        dag (DAGCircuit): the circuit to optimize, as produced by ``ast_to_dag``.
+            It is modified in place.
+        epr_time (float or callable): the link time spent generating one EPR
+            pair, or a function of its two qubits returning it.
+
+    Return:
+        tuple(DAGCircuit, float): the optimized DAG and the link time saved.
+    """
+    if not callable(epr_time):
+        epr_time = _constant(epr_time)
+
+    pairs = []
+    pair_of = {}  # qubit -> pair it currently holds a half of
+
+    for node in dag.topological_op_nodes():
+        name = node.op.name
+        if node.op.condition is not None:
+            _use(node.qargs, pair_of)
+        elif name == "epr":
+            pair = {"ends": set(node.qargs), "nodes": [node], "eprs": [tuple(node.qargs)],
+                    "used": False, "fused": False}
+            pairs.append(pair)
+            for qubit in node.qargs:
+                pair_of[qubit] = pair
+        elif name == "entswap" and _is_chain(node.qargs, pair_of):
+            links = [pair_of[qubit] for qubit in node.qargs[::2]]
+            pair = {"ends": {node.qargs[0], node.qargs[-1]}, "nodes": [node], "eprs": [],
+                    "used": False, "fused": False}
+            for link in links:
+                link["fused"] = True
+                pair["nodes"].extend(link["nodes"])
+                pair["eprs"].extend(link["eprs"])
+            pairs.append(pair)
+            # Measured middle qubits stay attached, so touching them keeps the chain
+            for qubit in node.qargs:
+                pair_of[qubit] = pair
+        elif name == "reset":
+            for qubit in node.qargs:
+                pair_of.pop(qubit, None)
+        elif name != "barrier":
+            _use(node.qargs, pair_of)
+
+    saved = 0.0
+    for pair in pairs:
+        if pair["used"] or pair["fused"]:
+            continue
+        for node in pair["nodes"]:
+            dag.remove_op_node(node)
+        saved += sum(epr_time(*qubits) for qubits in pair["eprs"])
+    return dag, saved
+
+
+def _use(qargs, pair_of):
+    for qubit in qargs:
+        pair = pair_of.pop(qubit, None)
+        if pair is not None:
+            pair["used"] = True
+
+
+def _is_chain(qargs, pair_of):
+    """Tell whether ``qargs`` lists whole, distinct pairs end to end."""
+    if len(qargs) % 2:
+        return False
+    links = set()
+    for index in range(0, len(qargs), 2):
+        pair = pair_of.get(qargs[index])
+        if pair is None or pair["ends"] != {qargs[index], qargs[index + 1]}:
+            return False
+        if pair is not pair_of.get(qargs[index + 1]) or id(pair) in links:
+            return False
+        links.add(id(pair))
+    return True
+
+
+def _constant(value):
+    return lambda *_: value
@@ -0,0 +1,171 @@
+import math
+
+from distributed_circuit.instructions import EntSwapInstr
+from distributed_circuit.topology import node_map
+
+
+class SwapLatencyModel:
+    """Latency model of entanglement swapping schedules.
+
+    A schedule is a binary tree over the EPR pairs of a chain: leaves are pair
+    indices and each inner node ``(left, right)`` is a Bell measurement fusing
+    the two segments at the node sitting between them. Every pair is assumed
+    ready at time zero. A swap starts once both segments are ready, takes
+    ``swap_time`` and its outcome then travels to the far end of the longer
+    segment, ``hop_time`` per hop.
+
+    By default, corrections are deferred: a flat ``entswap`` runs all its Bell
+    measurements at once and only corrects the end of the chain, as it is
+    lowered by :func:`~distributed_circuit.split.split_by_node`. Each
+    ``entswap`` of a tree still waits for the corrections of the level below.
+    Without ``deferred_corrections``, a segment is only ready once its
+    corrections are applied, so a flat ``entswap`` runs its swaps one after the
+    other. This is the case on hardware applying Pauli corrections before the
+    next Bell measurement.
+    """
+
+    def __init__(self, swap_time=1.0, hop_time=1.0, deferred_corrections=True):
+        self.swap_time = swap_time
+        self.hop_time = hop_time
+        self.deferred_corrections = deferred_corrections
+
+    def evaluate_flat(self, num_pairs):
+        """Return the latency of a flat ``entswap`` and when each swap starts.
+
+        Args:
+            num_pairs (int): the number of pairs of the chain.
+
+        Return:
+            tuple(float, dict): as :meth:`evaluate`.
+        """
+        if not self.deferred_corrections:
+            return self.evaluate(chain_schedule(num_pairs))
+        # The outcome of the first junction travels the farthest
+        latency = self.swap_time + self.hop_time * (num_pairs - 1)
+        return latency, {junction: 0.0 for junction in range(num_pairs - 1)}
+
+    def evaluate(self, schedule):
+        """Return the latency of ``schedule`` and when each swap starts.
+
+        Args:
+            schedule (int or tuple): the swap tree.
+
+        Return:
+            tuple(float, dict): the end-to-end latency, and the start time of the
+                swap at each junction, keyed by the index of the pair on its left.
+        """
+        starts = {}
+        ready, _, _, _ = self._evaluate(schedule, starts)
+        return ready, starts
+
+    def _evaluate(self, schedule, starts):
+        if not isinstance(schedule, tuple):
+            return 0.0, 1, schedule, schedule
+        left_ready, left_hops, first, junction = self._evaluate(schedule[0], starts)
+        right_ready, right_hops, _, last = self._evaluate(schedule[1], starts)
+        start = max(left_ready, right_ready)
+        starts[junction] = start
+        ready = start + self.swap_time + self.hop_time * max(left_hops, right_hops)
+        return ready, left_hops + right_hops, first, last
+
+
+def chain_schedule(num_pairs):
+    """Return the sequential swap tree implied by a flat ``entswap``."""
+    schedule = 0
+    for index in range(1, num_pairs):
+        schedule = (schedule, index)
+    return schedule
+
+
+def balanced_schedule(num_pairs, first=0):
+    """Return a swap tree of logarithmic depth over ``num_pairs`` pairs."""
+    if num_pairs == 1:
+        return first
+    half = num_pairs // 2
+    return (balanced_schedule(half, first), balanced_schedule(num_pairs - half, first + half))
+
+
+def balance_entswap(circuit, latency_model=None, qubit_to_node=None, memory_limit=None):
+    """Rewrite long ``entswap`` chains into tree-structured swap schedules.
+
+    A flat ``entswap q[0],q[1],...,q[2k-1]`` fuses ``k`` pairs one after the other,
+    in ``O(k)`` rounds when corrections are applied after each swap. It is
+    replaced by ``k - 1`` two-pair ``entswap`` arranged as a balanced tree, whose
+    swaps on disjoint qubits run in parallel, in ``O(log k)`` rounds. Both
+    schedules are weighed with ``latency_model`` and the rewrite only happens
+    when the tree is strictly faster and no junction has to hold its qubits
+    longer than the memory limit of its node.
+
+    The default latency model follows :func:`~distributed_circuit.split.split_by_node`,
+    which runs the Bell measurements of a flat ``entswap`` in a single round, so
+    chains are then always kept. Pass a model without ``deferred_corrections``
+    when targeting hardware that corrects after each swap.
+
+    Args:
+        circuit (DistQuantumCircuit): the circuit to optimize.
+        latency_model (SwapLatencyModel): the latency model, default one if None.
+        qubit_to_node (dict): the QPU holding each qubit, only needed for
+            per-node memory limits. Taken from the topology of the circuit if None.
+        memory_limit (float or dict): the longest time a junction may store its
+            qubits, for every node or per node. Unbounded if None.
+
+    Return:
+        DistQuantumCircuit: the optimized circuit.
+    """
+    if latency_model is None:
+        latency_model = SwapLatencyModel()
+    if isinstance(memory_limit, dict):
+        qubit_to_node = node_map(circuit, qubit_to_node)
+
+    balanced = circuit.copy_empty_like()
+    for instruction, qargs, cargs in circuit.data:
+        num_pairs = len(qargs) // 2
+        if (instruction.name != "entswap" or instruction.condition is not None
+                or len(qargs) % 2 or num_pairs < 3):
+            balanced._append(instruction, qargs, cargs)
+            continue
+
+        flat_cost = _cost(latency_model.evaluate_flat(num_pairs), qargs, qubit_to_node,
+                          memory_limit)
+        schedule = balanced_schedule(num_pairs)
+        tree_cost = _cost(latency_model.evaluate(schedule), qargs, qubit_to_node, memory_limit)
+        if not tree_cost < flat_cost:
+            balanced._append(instruction, qargs, cargs)
+            continue
+        for first, junction, last in _swaps(schedule):
+            balanced._append(EntSwapInstr(4), [qargs[2 * first], qargs[2 * junction + 1],
+                                               qargs[2 * junction + 2], qargs[2 * last + 1]], [])
+    return balanced
+
+
+def _cost(evaluation, qargs, qubit_to_node, memory_limit):
+    """Latency of an evaluated schedule, infinite if it breaks a memory limit."""
+    latency, starts = evaluation
+    if memory_limit is None:
+        return latency
+    for junction, start in starts.items():
+        limit = memory_limit
+        if isinstance(memory_limit, dict):
+            limit = memory_limit.get(qubit_to_node[qargs[2 * junction + 1]], math.inf)
+        if start > limit:
+            return math.inf
+    return latency
+
+
+def _swaps(schedule):
+    """List the swaps of ``schedule`` as ``(first, junction, last)`` pair
+    indices, ordered by their level in the tree."""
+    swaps = []
+
+    def visit(subtree):
+        if not isinstance(subtree, tuple):
+            return 0, subtree, subtree
+        left_level, first, junction = visit(subtree[0])
+        right_level, _, last = visit(subtree[1])
+        level = max(left_level, right_level) + 1
+        swaps.append((level, first, junction, last))
+        return level, first, last
+
+    visit(schedule)
+    swaps.sort(key=lambda swap: swap[0])
+    return [swap[1:] for swap in swaps]
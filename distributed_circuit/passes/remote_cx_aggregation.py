@@ -0,0 +1,126 @@
+from distributed_circuit.instructions import RemoteCxInstr
+from distributed_circuit.topology import node_map
+
+# Gates that commute with a CX when applied on its control wire.
+DIAGONAL_GATES = {"id", "i", "z", "s", "sdg", "t", "tdg", "rz", "p", "u1", "cz", "cp", "crz", "cu1",
+                  "rzz"}
+
+# Number of leading control qubits of the controlled gates.
+CONTROLLED_GATES = {"cx": 1, "cy": 1, "ch": 1, "crx": 1, "cry": 1, "cu": 1, "cu3": 1, "csx": 1,
+                    "cswap": 1, "ccx": 2, "remoteCx": 1}
+
+# Gates that commute with a CX when applied on its target wire.
+X_GATES = {"id", "i", "x", "sx", "sxdg", "rx"}
+
+
+def commutes_on_control(instruction, index):
+    """Tell whether ``instruction`` acting with its ``index``-th qubit on the
+    control wire of a CX commutes with it."""
+    if instruction.condition is not None:
+        return False
+    if instruction.name in DIAGONAL_GATES:
+        return True
+    return index < CONTROLLED_GATES.get(instruction.name, 0)
+
+
+def commutes_on_target(instruction, index):
+    """Tell whether ``instruction`` acting with its ``index``-th qubit on the
+    target wire of a CX commutes with it."""
+    if instruction.condition is not None:
+        return False
+    if instruction.name in X_GATES:
+        return True
+    if instruction.name == "remoteCx":
+        return index >= 3
+    return instruction.name in ("cx", "ccx") and index == instruction.num_qubits - 1
+
+
+def aggregate_remote_cx(circuit, qubit_to_node=None):
+    """Merge runs of ``remoteCx`` sharing a control into one cat-entanglement.
+
+    A run is a sequence of ``remoteCx`` with the same control qubit whose targets
+    live on the same remote QPU. Gates in between are allowed as long as they
+    commute with the moved CXs: diagonal gates on the control, X-type gates on
+    the targets. Every run is rewritten into a single multi-target ``remoteCx``
+    placed where the run starts, and the ``epr`` instructions feeding the merged
+    gates are dropped, so the EPR count shrinks by the run length minus one.
+
+    Only ``remoteCx`` whose EPR pair comes straight from an ``epr`` instruction
+    are merged. The pass visits each instruction once and keeps, for each qubit,
+    the index of the last instruction acting on it and of the last one that
+    does not commute with a CX target, so it runs in linear time.
+
+    Args:
+        circuit (DistQuantumCircuit): the circuit to optimize.
+        qubit_to_node (dict): the QPU holding each qubit of the circuit. Taken
+            from the topology of the circuit if None.
+
+    Return:
+        DistQuantumCircuit: the optimized circuit.
+    """
+    qubit_to_node = node_map(circuit, qubit_to_node)
+    data = list(circuit.data)
+    removed = set()
+    last_op = {}  # qubit -> index of the last instruction acting on it
+    last_blocker = {}  # qubit -> index of the last instruction not commuting with a CX target
+    runs = {}  # (control, target node) -> open run
+    control_runs = {}  # control -> keys of its open runs
+    heads = {}  # index of the first remoteCx of a run -> run
+
+    for index, (instruction, qargs, _) in enumerate(data):
+        if instruction.name == "remoteCx" and instruction.condition is None:
+            control, comm0, comm1, targets = qargs[0], qargs[1], qargs[2], qargs[3:]
+            nodes = {qubit_to_node[target] for target in targets}
+            key = (control, nodes.pop()) if len(nodes) == 1 else None
+            run = runs.get(key)
+            if run is not None and _can_join(run, data, comm0, comm1, targets, last_op,
+                                             last_blocker):
+                removed.add(index)
+                removed.add(last_op[comm0])
+                run["targets"].extend(targets)
+                run["target_set"].update(targets)
+            elif key is not None:
+                run = {"index": index, "qargs": list(qargs[:3]), "targets": list(targets),
+                       "target_set": set(targets)}
+                runs[key] = run
+                heads[index] = run
+                control_runs.setdefault(control, set()).add(key)
+
+        # A joined remoteCx moves up, so it still ends the runs controlled by its targets
+        for position, qubit in enumerate(qargs):
+            if qubit in control_runs and not commutes_on_control(instruction, position):
+                for key in control_runs.pop(qubit):
+                    del runs[key]
+
+        for position, qubit in enumerate(qargs):
+            last_op[qubit] = index
+            if not commutes_on_target(instruction, position):
+                last_blocker[qubit] = index
+
+    aggregated = circuit.copy_empty_like()
+    for index, (instruction, qargs, cargs) in enumerate(data):
+        if index in removed:
+            continue
+        run = heads.get(index)
+        if run is not None and len(run["targets"]) > len(qargs) - 3:
+            aggregated._append(RemoteCxInstr(len(run["targets"])),
+                               run["qargs"] + run["targets"], [])
+        else:
+            aggregated._append(instruction, qargs, cargs)
+    return aggregated
+
+
+def _can_join(run, data, comm0, comm1, targets, last_op, last_blocker):
+    """Tell whether a ``remoteCx`` can be hoisted into ``run``."""
+    producer = last_op.get(comm0)
+    if producer is None or producer != last_op.get(comm1):
+        return False
+    epr, epr_qargs, _ = data[producer]
+    if epr.name != "epr" or epr.condition is not None or set(epr_qargs) != {comm0, comm1}:
+        return False
+    for target in targets:
+        if target in run["target_set"] or target in run["qargs"]:
+            return False
+        if last_blocker.get(target, -1) > run["index"]:
+            return False
+    return True
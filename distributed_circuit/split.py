@@ -0,0 +1,184 @@
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister, QiskitError
+from qiskit.circuit import Barrier, Clbit, Measure
+from qiskit.circuit.library import CXGate, HGate, XGate, ZGate
+
+from .instructions import EPRHalfInstr, SendInstr, RecvInstr
+from .topology import node_map
+
+
+def split_by_node(circuit, qubit_to_node=None):
+    """Split a distributed circuit into one local circuit per QPU.
+
+    Local operations go to the circuit of the node holding their qubits.
+    ``epr``, ``remoteCx`` and ``entswap`` are replaced by their local halves:
+    each node keeps an ``epr_half`` of the pairs it shares, the gates and
+    measurements it runs for a remote operation, and explicit ``send`` and
+    ``recv`` annotations for the classical bits exchanged with other nodes.
+    Every exchanged bit gets its own one-bit ``msg`` register, shared by the
+    circuits of the sender and of the receiver. The classical registers of the
+    circuit are shared by all nodes, and a bit a condition depends on is sent
+    from the node that last wrote it, when that is another node.
+
+    Args:
+        circuit (DistQuantumCircuit): the circuit to split.
+        qubit_to_node (dict): the QPU holding each qubit of the circuit. Taken
+            from the topology of the circuit if None.
+
+    Return:
+        dict: the local ``QuantumCircuit`` of each node, in order of first qubit.
+
+    Raises:
+        QiskitError: if an operation other than the remote ones spans several
+            nodes, or if a remote operation is conditional or ill-placed.
+    """
+    return _NodeSplitter(circuit, node_map(circuit, qubit_to_node)).run()
+
+
+class _NodeSplitter:
+
+    def __init__(self, circuit, qubit_to_node):
+        self.circuit = circuit
+        self.qubit_to_node = qubit_to_node
+        self.local = {}
+        self.messages = 0
+        self.writer = {}  # clbit -> node that last wrote it
+        self.holders = {}  # clbit -> nodes knowing its last value
+
+        for qubit in circuit.qubits:
+            node = qubit_to_node[qubit]
+            if node not in self.local:
+                self.local[node] = QuantumCircuit(name="{}_{}".format(circuit.name, node))
+        for node, local in self.local.items():
+            for register in circuit.qregs:
+                bits = [bit for bit in register if qubit_to_node[bit] == node]
+                if bits:
+                    local.add_register(QuantumRegister(name=register.name, bits=bits))
+            local.add_bits([qubit for qubit in circuit.qubits if qubit_to_node[qubit] == node
+                            and not circuit.find_bit(qubit).registers])
+            local.add_bits([clbit for clbit in circuit.clbits
+                            if not circuit.find_bit(clbit).registers])
+            local.add_register(*circuit.cregs)
+        if self.local:
+            next(iter(self.local.values())).global_phase = circuit.global_phase
+
+    def run(self):
+        for instruction, qargs, cargs in self.circuit.data:
+            if instruction.name == "epr":
+                self._epr(instruction, qargs)
+            elif instruction.name == "remoteCx":
+                self._remote_cx(instruction, qargs)
+            elif instruction.name == "entswap":
+                self._entswap(instruction, qargs)
+            elif instruction.name == "barrier":
+                for node in self._nodes(qargs):
+                    qubits = [qubit for qubit in qargs if self.qubit_to_node[qubit] == node]
+                    self.local[node]._append(Barrier(len(qubits)), qubits, [])
+            else:
+                nodes = self._nodes(qargs)
+                if len(nodes) > 1:
+                    raise QiskitError("{} acts on qubits of several nodes: {}".format(
+                        instruction.name, ", ".join(str(node) for node in nodes)))
+                if nodes:
+                    self._fetch_condition(instruction, nodes[0])
+                    self.local[nodes[0]]._append(instruction, qargs, cargs)
+                    for clbit in cargs:
+                        self.writer[clbit] = nodes[0]
+                        self.holders[clbit] = {nodes[0]}
+        return self.local
+
+    def _nodes(self, qargs):
+        nodes = []
+        for qubit in qargs:
+            node = self.qubit_to_node[qubit]
+            if node not in nodes:
+                nodes.append(node)
+        return nodes
+
+    def _check(self, instruction, groups):
+        """Return the node of each group of qubits, which must share one."""
+        if instruction.condition is not None:
+            raise QiskitError("Cannot split conditional {}".format(instruction.name))
+        nodes = []
+        for group in groups:
+            group_nodes = self._nodes(group)
+            if len(group_nodes) != 1:
+                raise QiskitError("{} expects qubits {} on a single node".format(
+                    instruction.name, ", ".join(str(qubit) for qubit in group)))
+            nodes.append(group_nodes[0])
+        return nodes
+
+    def _transfer(self, source, destination):
+        """Return a new register carrying a bit from ``source`` to ``destination``."""
+        register = ClassicalRegister(1, "msg{}".format(self.messages))
+        self.messages += 1
+        self.local[source].add_register(register)
+        if destination != source:
+            self.local[destination].add_register(register)
+        return register
+
+    def _send(self, clbit, source, destination):
+        if destination != source:
+            self.local[source]._append(SendInstr(destination), [], [clbit])
+            self.local[destination]._append(RecvInstr(source), [], [clbit])
+
+    def _fetch_condition(self, instruction, node):
+        """Send to ``node`` the bits the condition of ``instruction`` depends on."""
+        if instruction.condition is None:
+            return
+        target = instruction.condition[0]
+        clbits = [target] if isinstance(target, Clbit) else list(target)
+        for clbit in clbits:
+            holders = self.holders.get(clbit)
+            if holders is not None and node not in holders:
+                self._send(clbit, self.writer[clbit], node)
+                holders.add(node)
+
+    def _epr(self, instruction, qargs):
+        node0, node1 = self._check(instruction, [qargs[:1], qargs[1:]])
+        if node0 == node1:
+            self.local[node0]._append(HGate(), [qargs[0]], [])
+            self.local[node0]._append(CXGate(), [qargs[0], qargs[1]], [])
+        else:
+            self.local[node0]._append(EPRHalfInstr(node1), [qargs[0]], [])
+            self.local[node1]._append(EPRHalfInstr(node0), [qargs[1]], [])
+
+    def _remote_cx(self, instruction, qargs):
+        control, comm0, comm1, targets = qargs[0], qargs[1], qargs[2], qargs[3:]
+        source, destination = self._check(instruction, [[control, comm0], [comm1] + targets])
+        local_source, local_destination = self.local[source], self.local[destination]
+
+        # Cat-entangle the control with comm1
+        entangle = self._transfer(source, destination)
+        local_source._append(CXGate(), [control, comm0], [])
+        local_source._append(Measure(), [comm0], [entangle[0]])
+        self._send(entangle[0], source, destination)
+        local_destination._append(XGate().c_if(entangle, 1), [comm1], [])
+        for target in targets:
+            local_destination._append(CXGate(), [comm1, target], [])
+
+        # Disentangle
+        disentangle = self._transfer(destination, source)
+        local_destination._append(HGate(), [comm1], [])
+        local_destination._append(Measure(), [comm1], [disentangle[0]])
+        self._send(disentangle[0], destination, source)
+        local_source._append(ZGate().c_if(disentangle, 1), [control], [])
+
+    def _entswap(self, instruction, qargs):
+        if len(qargs) % 2:
+            raise QiskitError("entswap expects an even number of qubits")
+        junctions = [qargs[index:index + 2] for index in range(1, len(qargs) - 1, 2)]
+        nodes = self._check(instruction, [qargs[-1:]] + junctions)
+        end, junction_nodes = nodes[0], nodes[1:]
+        corrections = []
+        for (qubit0, qubit1), node in zip(junctions, junction_nodes):
+            phase, flip = self._transfer(node, end), self._transfer(node, end)
+            self.local[node]._append(CXGate(), [qubit0, qubit1], [])
+            self.local[node]._append(HGate(), [qubit0], [])
+            self.local[node]._append(Measure(), [qubit0], [phase[0]])
+            self.local[node]._append(Measure(), [qubit1], [flip[0]])
+            self._send(phase[0], node, end)
+            self._send(flip[0], node, end)
+            corrections.append((phase, flip))
+        for phase, flip in corrections:
+            self.local[end]._append(XGate().c_if(flip, 1), [qargs[-1]], [])
+            self.local[end]._append(ZGate().c_if(phase, 1), [qargs[-1]], [])
@@ -0,0 +1,173 @@
+from qiskit import QiskitError
+
+# Operations needing entanglement between nodes
+REMOTE_OPERATIONS = {"epr", "remoteCx", "entswap"}
+
+
+class NetworkTopology:
+    """Network of QPUs running a distributed circuit.
+
+    Each node holds data qubits and communication qubits, the latter being the
+    ones EPR pairs are generated on. Links between nodes have a capacity, the
+    number of EPR pairs they can generate at once.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.qubit_to_node = {}
+        self.data_qubits = {}
+        self.comm_qubits = {}
+        self.links = {}
+
+    def add_node(self, node, data_qubits=(), comm_qubits=()):
+        """Add a node with its data and communication qubits.
+        Args:
+            node (hashable): the name of the node
+            data_qubits (list(Qubit)): the data qubits of the node
+            comm_qubits (list(Qubit)): the communication qubits of the node
+        Raises:
+            QiskitError: if the node or one of the qubits is already in the network
+        """
+        if node in self.data_qubits:
+            raise QiskitError("node {} already exists".format(node))
+        for qubit in list(data_qubits) + list(comm_qubits):
+            if qubit in self.qubit_to_node:
+                raise QiskitError("qubit {} already belongs to node {}".format(
+                    qubit, self.qubit_to_node[qubit]))
+            self.qubit_to_node[qubit] = node
+        self.nodes.append(node)
+        self.data_qubits[node] = list(data_qubits)
+        self.comm_qubits[node] = list(comm_qubits)
+
+    def add_link(self, node0, node1, capacity=1):
+        """Add a link between two nodes.
+        Args:
+            node0 (hashable): a node
+            node1 (hashable): another node
+            capacity (int): the number of EPR pairs the link generates at once
+        """
+        for node in (node0, node1):
+            if node not in self.data_qubits:
+                raise QiskitError("node {} does not exist".format(node))
+        self.links[link_key(node0, node1)] = capacity
+
+    def node_of(self, qubit):
+        """Return the node holding ``qubit``, None if not in the network."""
+        return self.qubit_to_node.get(qubit)
+
+    def is_comm_qubit(self, qubit):
+        """Tell whether ``qubit`` is a communication qubit."""
+        node = self.qubit_to_node.get(qubit)
+        return node is not None and qubit in self.comm_qubits[node]
+
+    def capacity(self, node0, node1):
+        """Return the capacity of the link between two nodes, 0 if not linked."""
+        return self.links.get(link_key(node0, node1), 0)
+
+
+def node_map(circuit, qubit_to_node=None):
+    """Return ``qubit_to_node``, or the one of the topology of ``circuit`` if None.
+
+    Raises:
+        QiskitError: if neither is available
+    """
+    if qubit_to_node is not None:
+        return qubit_to_node
+    topology = getattr(circuit, "topology", None)
+    if topology is None:
+        raise QiskitError("The circuit has no topology, the node of each qubit must be given")
+    return topology.qubit_to_node
+
+
+def link_key(node0, node1):
+    """Return the key of the link between two nodes, whatever their order."""
+    return frozenset((node0, node1))
+
+
+class EPRResourceIndex:
+    """Entanglement resources used by a circuit, kept up to date as it changes.
+
+    For each link it lists the ``epr`` instructions between its nodes, and for
+    each node it counts the remote operations it takes part in and the qubits it
+    uses, so that cost queries do not need to scan the circuit.
+    """
+
+    def __init__(self, topology):
+        self.topology = topology
+        self._eprs = {}
+        self._remote_ops = {}
+        self._used_qubits = {}
+
+    def add(self, instruction, qargs):
+        """Record an instruction appended to the circuit."""
+        qubit_to_node = self.topology.qubit_to_node
+        nodes = set()
+        for qubit in qargs:
+            node = qubit_to_node.get(qubit)
+            if node is not None:
+                nodes.add(node)
+                used = self._used_qubits.setdefault(node, {})
+                used[qubit] = used.get(qubit, 0) + 1
+        if instruction.name not in REMOTE_OPERATIONS:
+            return
+        for node in nodes:
+            self._remote_ops[node] = self._remote_ops.get(node, 0) + 1
+        if instruction.name == "epr" and len(nodes) == 2:
+            self._eprs.setdefault(frozenset(nodes), []).append(instruction)
+
+    def remove(self, instruction, qargs):
+        """Forget an instruction removed from the circuit."""
+        qubit_to_node = self.topology.qubit_to_node
+        nodes = set()
+        for qubit in qargs:
+            node = qubit_to_node.get(qubit)
+            if node is not None:
+                nodes.add(node)
+                used = self._used_qubits[node]
+                used[qubit] -= 1
+                if not used[qubit]:
+                    del used[qubit]
+        if instruction.name not in REMOTE_OPERATIONS:
+            return
+        for node in nodes:
+            self._remote_ops[node] -= 1
+        if instruction.name == "epr" and len(nodes) == 2:
+            eprs = self._eprs[frozenset(nodes)]
+            # Removed instructions are most often the last ones
+            for position in range(len(eprs) - 1, -1, -1):
+                if eprs[position] is instruction:
+                    del eprs[position]
+                    break
+
+    def clear(self):
+        """Forget every recorded instruction."""
+        self._eprs.clear()
+        self._remote_ops.clear()
+        self._used_qubits.clear()
+
+    def eprs(self, node0, node1):
+        """Return the ``epr`` instructions between two nodes."""
+        return self._eprs.get(link_key(node0, node1), [])
+
+    def epr_count(self, node0, node1):
+        """Return the number of ``epr`` instructions between two nodes."""
+        return len(self._eprs.get(link_key(node0, node1), ()))
+
+    def link_load(self, node0, node1):
+        """Return the number of EPR pairs per unit of capacity of a link.
+
+        Raises:
+            QiskitError: if the nodes are not linked
+        """
+        capacity = self.topology.capacity(node0, node1)
+        if not capacity:
+            raise QiskitError("nodes {} and {} are not linked".format(node0, node1))
+        return self.epr_count(node0, node1) / capacity
+
+    def remote_ops(self, node):
+        """Return the number of remote operations ``node`` takes part in."""
+        return self._remote_ops.get(node, 0)
+
+    def occupancy(self, node):
+        """Return the number of qubits of ``node`` the circuit uses."""
+        return len(self._used_qubits.get(node, ()))
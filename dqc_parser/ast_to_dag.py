@@ -168,15 +168,18 @@ class DQCAstInterpreter(AstInterpreter):
         id0 = self._process_bit_id(node.children[0])
         eid0 = self._process_bit_id(node.children[1])
         eid1 = self._process_bit_id(node.children[2])
-        id1 = self._process_bit_id(node.children[3])
-        if not (len(id0) == len(id1) or len(id0) == 1 or len(id1) == 1):
-            raise QiskitError("internal error: qreg size mismatch",
-                              "line=%s" % node.line, "file=%s" % node.file)
+        ids1 = self._process_node(node.children[3])
+        for id1 in ids1:
+            if not (len(id0) == len(id1) or len(id0) == 1 or len(id1) == 1):
+                raise QiskitError("internal error: qreg size mismatch",
+                                  "line=%s" % node.line, "file=%s" % node.file)
         if not (len(eid0) == len(eid1) or len(eid0) == 1 or len(eid1) == 1):
             raise QiskitError("internal error: qreg size mismatch",
                               "line=%s" % node.line, "file=%s" % node.file)
 
-        self.dag.apply_operation_back(RemoteCxInstr(), [id0[0], eid0[0], eid1[0], id1[0]])
+        targets = [id1[0] for id1 in ids1]
+        self.dag.apply_operation_back(RemoteCxInstr(len(targets)),
+                                      [id0[0], eid0[0], eid1[0]] + targets)
 
     def _process_entswap(self, node):
         """Process a ENTSWAP gate node."""
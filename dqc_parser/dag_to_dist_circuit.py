@@ -38,9 +38,8 @@ def dag_to_dist_circuit(dag):
     circuit.calibrations = dag.calibrations
 
     for node in dag.topological_op_nodes():
-        # Get arguments for classical control (if any)
+        # The copied operation keeps its classical control (if any)
         inst = node.op.copy()
-        inst.condition = node.condition
         circuit._append(inst, node.qargs, node.cargs)
 
     circuit.duration = dag.duration
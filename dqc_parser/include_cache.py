@@ -0,0 +1,68 @@
+import os
+
+# (absolute path, symbols declared before) -> (modification time, GateLibrary)
+_LIBRARIES = {}
+
+
+class GateLibrary:
+    """A parsed include file.
+
+    Holds the ``program`` node of the file, spliced into the AST of every
+    program including it, and the ``symbols`` it declares, injected into the
+    global symbol table of the including parser.
+    """
+
+    def __init__(self, program, symbols):
+        self.program = program
+        self.symbols = symbols
+
+
+def load_library(path, symbols=None):
+    """Return the parsed library at ``path``.
+
+    Libraries are cached by absolute path and modification time, so an unchanged
+    include file is only parsed the first time it is loaded. As with a textual
+    include, the library may use the gates already declared by the including
+    program, so these names, with the arity of gates, are part of the cache key
+    too.
+
+    Args:
+        path (str): path to the include file
+        symbols (dict): the global symbol table of the including program
+
+    Return:
+        GateLibrary: the parsed library, without the symbols it was given
+    """
+    symbols = symbols or {}
+    path = os.path.abspath(path)
+    mtime = os.stat(path).st_mtime_ns
+    key = (path, frozenset(_signature(name, symbol) for name, symbol in symbols.items()))
+    cached = _LIBRARIES.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    # pylint: disable=cyclic-import
+    from .parser import DQCParser
+
+    with open(path) as ifile:
+        data = ifile.read()
+    with DQCParser(path) as qasm_p:
+        qasm_p.global_symtab.update(symbols)
+        qasm_p.parse_debug(False)
+        program = qasm_p.parse(data)
+        library = GateLibrary(program, {name: symbol for name, symbol in
+                                        qasm_p.global_symtab.items() if name not in symbols})
+    _LIBRARIES[key] = (mtime, library)
+    return library
+
+
+def _signature(name, symbol):
+    """Return what a library may rely on about a declared symbol."""
+    if symbol.type in ("gate", "opaque"):
+        return name, symbol.type, symbol.n_args(), symbol.n_bits()
+    return name, symbol.type
+
+
+def clear_library_cache():
+    """Forget every parsed library."""
+    _LIBRARIES.clear()
@@ -1,6 +1,7 @@
 import os
 
 import qiskit.qasm.qasmlexer
+from qiskit.qasm import QasmError
 from qiskit.qasm.qasmlexer import QasmLexer
 
 CORE_LIBS_PATH = qiskit.qasm.qasmlexer.CORE_LIBS_PATH
@@ -9,11 +10,33 @@ CORE_LIBS = os.listdir(CORE_LIBS_PATH)
 
 class DQCLexer(QasmLexer):
 
-    def __init__(self, filename):
-        self.reserved.update({"entswap": "ENTSWAP"})
-        self.tokens.append("ENTSWAP")
-        self.reserved.update({"remoteCx": "REMOTECX"})
-        self.tokens.append("REMOTECX")
-        self.reserved.update({"epr": "EPR"})
-        self.tokens.append("EPR")
-        super().__init__(filename)
+    reserved = dict(QasmLexer.reserved, entswap="ENTSWAP", remoteCx="REMOTECX", epr="EPR")
+    tokens = QasmLexer.tokens + ["ENTSWAP", "REMOTECX", "EPR", "INCLUDED"]
+
+    def t_INCLUDE(self, t):
+        "include"
+        # Eat up the name of the include file and the terminating semicolon,
+        # and hand the path over to the parser, which loads the library once
+        # the statements before are reduced, instead of lexing the file.
+        next_token = self.lexer.token()
+        lineno = next_token.lineno
+        if isinstance(next_token.value, str):
+            incfile = next_token.value.strip('"')
+        else:
+            raise QasmError("Invalid include: must be a quoted string.")
+
+        if incfile in CORE_LIBS:
+            incfile = os.path.join(CORE_LIBS_PATH, incfile)
+
+        next_token = self.lexer.token()
+        if next_token is None or next_token.value != ";":
+            raise QasmError('Invalid syntax, missing ";" at line', str(lineno))
+
+        if not os.path.exists(incfile):
+            raise QasmError(
+                "Include file %s cannot be found, line %s, file %s"
+                % (incfile, str(next_token.lineno), self.filename)
+            )
+        t.type = "INCLUDED"
+        t.value = incfile
+        return t
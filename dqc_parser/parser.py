@@ -5,6 +5,7 @@ from ply import yacc
 from qiskit.qasm.qasmparser import QasmParser
 
 from distributed_circuit.instructions import EPRNode, RemoteCxNode, EntSwapNode
+from .include_cache import load_library
 from .lexer import DQCLexer
 
 
@@ -61,6 +62,15 @@ class DQCParser(QasmParser):
     #     """
     #     raise QasmError("Invalid entswap inside gate definition.")
 
+    def p_statement_included(self, program):
+        """
+        statement : INCLUDED
+        """
+        library = load_library(program[1], self.global_symtab)
+        for symbol in library.symbols.values():
+            self.update_symtab(symbol)
+        program[0] = library.program
+
     def p_quantum_op(self, program):
         """
         quantum_op : unitary_op
@@ -87,14 +97,14 @@ class DQCParser(QasmParser):
 
     def p_remoteCx(self, program):
         """
-        remoteCx : REMOTECX primary ',' primary ',' primary ',' primary
+        remoteCx : REMOTECX primary ',' primary ',' primary ',' primary_list
         """
 
         program[0] = RemoteCxNode([program[2], program[4], program[6], program[8]])
         self.verify_reg(program[2], "qreg")
         self.verify_reg(program[4], "qreg")
         self.verify_reg(program[6], "qreg")
-        self.verify_reg(program[8], "qreg")
+        self.verify_reg_list(program[8], "qreg")
         self.verify_distinct([program[2], program[4], program[6], program[8]])
 
     def p_entswap(self, program):
@@ -0,0 +1,60 @@
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+
+from distributed_circuit import DistQuantumCircuit
+
+
+def _circuit(names=("q", "c"), reorder=False):
+    q = QuantumRegister(6, names[0])
+    c = ClassicalRegister(1, names[1])
+    circuit = DistQuantumCircuit(q, c)
+    if reorder:
+        circuit.epr(q[4], q[2])
+        circuit.epr(q[1], q[3])
+        circuit.remote_cx(q[0], q[2], q[4], q[5])
+        circuit.remote_cx(q[0], q[1], q[3], q[5])
+    else:
+        circuit.epr(q[1], q[3])
+        circuit.epr(q[2], q[4])
+        circuit.remote_cx(q[0], q[1], q[3], q[5])
+        circuit.remote_cx(q[0], q[2], q[4], q[5])
+    circuit.measure(q[5], c[0])
+    circuit.x(q[0]).c_if(c, 1)
+    return circuit
+
+
+def test_hash_ignores_commuting_order_and_register_names():
+    circuit = _circuit()
+    assert circuit.canonical_hash() == _circuit().canonical_hash()
+    assert circuit.equivalent(_circuit(("r", "m"), reorder=True))
+
+
+def test_hash_tells_different_circuits_apart():
+    circuit = _circuit()
+    other = _circuit()
+    other.h(0)
+    assert not circuit.equivalent(other)
+
+    q = QuantumRegister(4, "q")
+    forward = DistQuantumCircuit(q)
+    forward.remote_cx(q[0], q[1], q[2], q[3])
+    backward = DistQuantumCircuit(q)
+    backward.remote_cx(q[3], q[1], q[2], q[0])
+    assert not forward.equivalent(backward)
+
+
+def test_custom_gates_are_hashed_by_structure():
+    def block(angle):
+        block = QuantumCircuit(2, name="block")
+        block.h(0)
+        block.rz(angle, 1)
+        return block.to_gate()
+
+    q = QuantumRegister(2, "q")
+    shared, separate, other = (DistQuantumCircuit(q) for _ in range(3))
+    gate = block(0.3)
+    for index in range(4):
+        shared.append(gate, [q[index % 2], q[1 - index % 2]])
+        separate.append(block(0.3), [q[index % 2], q[1 - index % 2]])
+        other.append(block(0.3 if index else 0.5), [q[index % 2], q[1 - index % 2]])
+    assert shared.canonical_hash() == separate.canonical_hash()
+    assert shared.canonical_hash() != other.canonical_hash()
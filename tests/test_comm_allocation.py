@@ -0,0 +1,53 @@
+from qiskit import ClassicalRegister, QuantumRegister
+
+from distributed_circuit import DistQuantumCircuit, NetworkTopology
+from distributed_circuit.passes import allocate_comm_qubits
+
+
+def _circuit():
+    a, e, b = QuantumRegister(1, "a"), QuantumRegister(6, "e"), QuantumRegister(3, "b")
+    qc = DistQuantumCircuit(a, e, b, ClassicalRegister(1, "c"))
+    qc.epr(e[0], e[1])
+    qc.remote_cx(a[0], e[0], e[1], b[0])
+    qc.measure(e[0], 0)
+    qc.epr(e[2], e[3])
+    qc.epr(e[4], e[5])
+    qc.remote_cx(a[0], e[2], e[3], b[1])
+    qc.remote_cx(a[0], e[4], e[5], b[2])
+    topology = NetworkTopology()
+    topology.add_node("A", [a[0]], [e[0], e[2], e[4]])
+    topology.add_node("B", list(b), [e[1], e[3], e[5]])
+    qc.topology = topology
+    return qc
+
+
+def test_live_ranges_are_packed():
+    out, used = allocate_comm_qubits(_circuit())
+    assert used == {"A": 2, "B": 2}
+    assert out.count_ops()["reset"] == 2
+    assert "remoteCx a[0],e[0],e[1],b[1];" in out.qasm()
+
+
+def test_full_buffer_serializes_eprs():
+    out, used = allocate_comm_qubits(_circuit(), max_comm_qubits=1)
+    assert used == {"A": 1, "B": 1}
+    names = [instruction.name for instruction, _, _ in out.data]
+    assert names[-4:] == ["reset", "reset", "epr", "remoteCx"]
+
+
+def test_eprs_wait_for_their_first_use():
+    a, e, b = QuantumRegister(1, "a"), QuantumRegister(4, "e"), QuantumRegister(2, "b")
+    qc = DistQuantumCircuit(a, e, b)
+    qc.epr(e[0], e[1])
+    qc.epr(e[2], e[3])
+    qc.remote_cx(a[0], e[2], e[3], b[0])
+    qc.remote_cx(a[0], e[0], e[1], b[1])
+    topology = NetworkTopology()
+    topology.add_node("A", [a[0]], [e[0], e[2]])
+    topology.add_node("B", list(b), [e[1], e[3]])
+    qc.topology = topology
+    out, used = allocate_comm_qubits(qc, max_comm_qubits=1)
+    assert used == {"A": 1, "B": 1}
+    names = [instruction.name for instruction, _, _ in out.data]
+    assert names == ["epr", "remoteCx", "reset", "reset", "epr", "remoteCx"]
+    assert "remoteCx a[0],e[0],e[1],b[1];" in out.qasm()
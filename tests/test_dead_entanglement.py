@@ -0,0 +1,26 @@
+from distributed_circuit.dist_qasm import DistQasm
+from distributed_circuit.passes import eliminate_dead_entanglement
+from dqc_parser import ast_to_dag
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg q[8];
+creg c[1];
+epr q[0], q[5];
+epr q[2], q[1];
+entswap q[0],q[5],q[2],q[1];
+remoteCx q[7],q[0],q[1],q[6];
+epr q[3], q[4];
+epr q[3], q[4];
+measure q[3] -> c[0];
+epr q[0], q[5];
+epr q[2], q[1];
+entswap q[0],q[5],q[2],q[1];
+"""
+
+
+def test_dead_and_duplicate_pairs_are_removed():
+    dag = ast_to_dag(DistQasm(data=QASM).parse())
+    dag, saved = eliminate_dead_entanglement(dag, epr_time=2.5)
+    assert saved == 7.5
+    assert dag.count_ops() == {"epr": 3, "entswap": 1, "remoteCx": 1, "measure": 1}
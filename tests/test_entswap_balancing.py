@@ -0,0 +1,42 @@
+from qiskit import QuantumRegister
+
+from distributed_circuit import DistQuantumCircuit
+from distributed_circuit.passes import SwapLatencyModel, balance_entswap
+
+
+def _chain(num_pairs):
+    q = QuantumRegister(2 * num_pairs, "q")
+    circuit = DistQuantumCircuit(q)
+    circuit.etnswap(*q)
+    return circuit
+
+
+def _swaps(circuit):
+    return [[circuit.find_bit(qubit).index for qubit in qargs]
+            for _, qargs, _ in circuit.data]
+
+
+# Hardware applying the corrections of each swap before the next one
+SEQUENTIAL = SwapLatencyModel(deferred_corrections=False)
+
+
+def test_long_chain_becomes_a_tree():
+    balanced = balance_entswap(_chain(4), SEQUENTIAL)
+    assert _swaps(balanced) == [[0, 1, 2, 3], [4, 5, 6, 7], [0, 3, 4, 7]]
+
+
+def test_short_chains_and_ties_are_kept():
+    # Three pairs take as long as a chain or as a tree
+    assert SEQUENTIAL.evaluate_flat(3)[0] == SEQUENTIAL.evaluate((0, (1, 2)))[0]
+    assert _swaps(balance_entswap(_chain(3), SEQUENTIAL)) == [list(range(6))]
+    assert _swaps(balance_entswap(_chain(2), SEQUENTIAL)) == [list(range(4))]
+
+
+def test_memory_limit_blocking_both_schedules_keeps_the_chain():
+    assert _swaps(balance_entswap(_chain(4), SEQUENTIAL, memory_limit=0.5)) == [
+        list(range(8))]
+
+
+def test_default_model_keeps_the_chain():
+    # split_by_node runs the Bell measurements of a flat entswap in one round
+    assert _swaps(balance_entswap(_chain(8))) == [list(range(16))]
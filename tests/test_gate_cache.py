@@ -0,0 +1,110 @@
+import pytest
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.converters import circuit_to_dag, dag_to_circuit
+from qiskit.transpiler.passes import Decompose
+
+from distributed_circuit import DistQuantumCircuit
+from distributed_circuit.gate_cache import definition_key
+
+
+def _block(angle):
+    block = QuantumCircuit(2, name="block")
+    block.h(0)
+    block.cx(0, 1)
+    block.rz(angle, 1)
+    return block.to_gate()
+
+
+def test_definition_key_is_structural():
+    assert definition_key(_block(0.3)) == definition_key(_block(0.3))
+    assert definition_key(_block(0.3)) != definition_key(_block(0.5))
+
+
+def test_decompose_expands_repeated_blocks():
+    q = QuantumRegister(4, "q")
+    circuit = DistQuantumCircuit(q)
+    for index in range(3):
+        circuit.append(_block(0.3), [q[index], q[index + 1]])
+    circuit.append(_block(0.5), [q[3], q[0]])
+    decomposed = circuit.decompose()
+    assert decomposed.count_ops() == {"h": 4, "cx": 4, "rz": 4}
+    assert decomposed == dag_to_circuit(Decompose().run(circuit_to_dag(circuit)))
+
+    circuit.epr(q[0], q[3])
+    assert circuit.decompose().count_ops()["epr"] == 1
+
+
+def test_decompose_to_fixed_point():
+    inner = QuantumCircuit(2, name="inner")
+    inner.append(_block(0.3), [0, 1])
+    inner.swap(0, 1)
+    q = QuantumRegister(3, "q")
+    circuit = DistQuantumCircuit(q)
+    circuit.append(inner.to_gate(), [q[0], q[1]])
+    circuit.append(inner.to_gate(), [q[1], q[2]])
+    circuit.epr(q[0], q[2])
+
+    assert set(circuit.decompose().count_ops()) == {"block", "swap", "epr"}
+    assert set(circuit.decompose(levels=2).count_ops()) == {"h", "cx", "rz", "epr"}
+    decomposed = circuit.decompose(levels=None, stop_at={"swap"})
+    assert set(decomposed.count_ops()) == {"u", "cx", "swap", "epr"}
+    assert set(circuit.decompose(levels=None).count_ops()) == {"u", "cx", "epr"}
+
+
+def test_qasm_writes_each_definition_once():
+    q = QuantumRegister(3, "q")
+    circuit = DistQuantumCircuit(q)
+    circuit.append(_block(0.3), [q[0], q[1]])
+    circuit.append(_block(0.3), [q[1], q[2]])
+    circuit.append(_block(0.5), [q[2], q[0]])
+    # Clashes with the standard h gate
+    clash = QuantumCircuit(2, name="h")
+    clash.cx(0, 1)
+    circuit.append(clash.to_gate(), [q[0], q[1]])
+    circuit.append(clash.to_gate(), [q[1], q[2]])
+
+    with pytest.warns(UserWarning):
+        qasm = circuit.qasm()
+    definitions = [line for line in qasm.splitlines() if line.startswith("gate ")]
+    assert len(definitions) == 3
+    assert sum(line.startswith("gate h_") for line in definitions) == 1
+    with pytest.warns(UserWarning):
+        assert circuit.qasm() == qasm
+
+
+def _conditional_block():
+    block = QuantumCircuit(1, 2, name="cblock")
+    block.measure(0, 0)
+    block.x(0).c_if(block.clbits[0], 1)
+    block.z(0).c_if(block.cregs[0], 2)
+    return block.to_instruction()
+
+
+def test_decompose_maps_conditions_of_definitions():
+    q = QuantumRegister(1, "q")
+    m = ClassicalRegister(2, "m")
+    circuit = DistQuantumCircuit(q, m)
+    circuit.append(_conditional_block(), [q[0]], [m[1], m[0]])
+    decomposed = circuit.decompose()
+    assert decomposed.data[1][0].condition == (m[1], 1)
+    assert decomposed.data[2][0].condition == (m, 1)
+
+    outer = QuantumCircuit(1, 2, name="outer")
+    outer.append(_conditional_block(), [0], [1, 0])
+    circuit = DistQuantumCircuit(q, m)
+    circuit.append(outer.to_instruction(), [q[0]], [m[1], m[0]])
+    flattened = circuit.decompose(levels=None)
+    assert [instruction.condition for instruction, _, _ in flattened.data] == [
+        None, (m[0], 1), (m, 2)]
+
+
+def test_decompose_copies_expanded_instructions():
+    q = QuantumRegister(2, "q")
+    block = _block(0.3)
+    circuit = DistQuantumCircuit(q)
+    circuit.append(block, [q[0], q[1]])
+    circuit.append(block, [q[1], q[0]])
+    decomposed = circuit.decompose()
+    decomposed.data[2][0].params[0] = 0.7
+    assert block.definition.data[2][0].params == [0.3]
+    assert decomposed.data[5][0].params == [0.3]
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+from qiskit.qasm import QasmError
+
+from distributed_circuit.dist_qasm import DistQasm
+from dqc_parser import ast_to_dag
+from dqc_parser import include_cache
+
+HEADER = 'OPENQASM 2.0;\ninclude "qelib1.inc";\n'
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    include_cache.clear_library_cache()
+    yield
+    include_cache.clear_library_cache()
+
+
+def _write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _parse(program):
+    return DistQasm(data=program).parse()
+
+
+def _library(path):
+    return include_cache._LIBRARIES[next(key for key in include_cache._LIBRARIES
+                                         if key[0] == str(path))][1]
+
+
+def test_library_is_parsed_once_until_modified(tmp_path):
+    library_path = tmp_path / "bell.inc"
+    _write(library_path, "gate bell a,b { h a; cx a,b; }\n", 10 ** 18)
+    program = HEADER + 'include "{}";\nqreg q[2];\nbell q[0],q[1];\nepr q[0],q[1];\n'.format(
+        library_path)
+
+    dag = ast_to_dag(_parse(program))
+    assert dag.count_ops() == {"bell": 1, "epr": 1}
+    library = _library(library_path)
+    _parse(program)
+    assert _library(library_path) is library
+
+    _write(library_path, "gate bell a,b { h a; cx a,b; x b; }\n", 2 * 10 ** 18)
+    _parse(program)
+    assert _library(library_path) is not library
+
+
+def test_cache_key_holds_gate_arity(tmp_path):
+    library_path = tmp_path / "uses_foo.inc"
+    _write(library_path, "gate bar a { foo a; }\n")
+    include = 'include "{}";\n'.format(library_path)
+    _parse(HEADER + "gate foo a { x a; }\n" + include)
+    with pytest.raises(QasmError):
+        _parse(HEADER + "gate foo a,b { cx a,b; }\n" + include)
+
+
+def test_include_errors(tmp_path):
+    with pytest.raises(QasmError):
+        _parse(HEADER + 'include "qelib1.inc";\n')
+    with pytest.raises(QasmError):
+        _parse(HEADER + 'include "{}";\n'.format(tmp_path / "missing.inc"))
@@ -0,0 +1,69 @@
+from distributed_circuit import DistQuantumCircuit
+from distributed_circuit.passes import aggregate_remote_cx
+
+QASM = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg a[1];
+qreg e[6];
+qreg b[3];
+epr e[0],e[1];
+remoteCx a[0],e[0],e[1],b[0];
+t a[0];
+x b[1];
+epr e[2],e[3];
+remoteCx a[0],e[2],e[3],b[1];
+epr e[4],e[5];
+remoteCx a[0],e[4],e[5],b[2];
+"""
+
+
+def _nodes(qc):
+    a, e, b = qc.qregs
+    nodes = {a[0]: "A", b[0]: "B", b[1]: "B", b[2]: "B"}
+    nodes.update({e[i]: "AB"[i % 2] for i in range(6)})
+    return nodes
+
+
+def test_run_shares_one_epr():
+    qc = DistQuantumCircuit.from_qasm_str(QASM)
+    out = aggregate_remote_cx(qc, _nodes(qc))
+    names = [instruction.name for instruction, _, _ in out.data]
+    assert names.count("epr") == 1
+    assert names.count("remoteCx") == 1
+    assert "remoteCx a[0],e[0],e[1],b[0],b[1],b[2];" in out.qasm()
+
+
+def test_non_commuting_gate_breaks_run():
+    qc = DistQuantumCircuit.from_qasm_str(QASM.replace("t a[0];", "h a[0];"))
+    out = aggregate_remote_cx(qc, _nodes(qc))
+    names = [instruction.name for instruction, _, _ in out.data]
+    assert names.count("epr") == 2
+    assert "remoteCx a[0],e[2],e[3],b[1],b[2];" in out.qasm()
+
+
+def test_joined_gate_ends_runs_on_its_targets():
+    qasm = """OPENQASM 2.0;
+include "qelib1.inc";
+qreg a[1];
+qreg b[1];
+qreg d[1];
+qreg c[2];
+qreg e[8];
+epr e[0],e[1];
+remoteCx b[0],e[0],e[1],c[0];
+epr e[2],e[3];
+remoteCx a[0],e[2],e[3],d[0];
+epr e[4],e[5];
+remoteCx a[0],e[4],e[5],b[0];
+epr e[6],e[7];
+remoteCx b[0],e[6],e[7],c[1];
+"""
+    qc = DistQuantumCircuit.from_qasm_str(qasm)
+    a, b, d, c, e = qc.qregs
+    nodes = {a[0]: "A", b[0]: "B", d[0]: "B", c[0]: "C", c[1]: "C"}
+    nodes.update({e[i]: "ABABCBCB"[i] for i in range(8)})
+    lines = aggregate_remote_cx(qc, nodes).qasm().splitlines()
+    # Moving CX(b, c[1]) before CX(a, b) would change c[1]
+    assert lines.index("remoteCx a[0],e[2],e[3],d[0],b[0];") < lines.index(
+        "remoteCx b[0],e[6],e[7],c[1];")
+    assert "remoteCx b[0],e[0],e[1],c[0];" in lines
@@ -0,0 +1,60 @@
+import pytest
+from qiskit import ClassicalRegister, QiskitError, QuantumRegister
+
+from distributed_circuit import DistQuantumCircuit, NetworkTopology
+
+
+def _circuit():
+    a, b, c = QuantumRegister(2, "a"), QuantumRegister(3, "b"), QuantumRegister(2, "c")
+    qc = DistQuantumCircuit(a, b, c, ClassicalRegister(1, "m"))
+    topology = NetworkTopology()
+    topology.add_node("A", [a[0]], [a[1]])
+    topology.add_node("B", [b[0]], [b[1], b[2]])
+    topology.add_node("C", [c[0]], [c[1]])
+    qc.topology = topology
+    qc.epr(a[1], b[1])
+    qc.epr(b[2], c[1])
+    qc.etnswap(a[1], b[1], b[2], c[1])
+    qc.remote_cx(a[0], a[1], c[1], c[0])
+    return qc
+
+
+def _registers(circuit):
+    return sorted(register.name for register in circuit.cregs)
+
+
+def test_remote_operations_are_split_into_local_halves():
+    local = _circuit().split_by_node()
+    assert list(local) == ["A", "B", "C"]
+    assert local["A"].count_ops() == {"epr_half": 1, "cx": 1, "measure": 1, "send": 1,
+                                      "recv": 1, "z": 1}
+    assert local["B"].count_ops() == {"epr_half": 2, "cx": 1, "h": 1, "measure": 2, "send": 2}
+    assert local["C"].count_ops() == {"epr_half": 1, "recv": 3, "x": 2, "z": 1, "cx": 1,
+                                      "h": 1, "measure": 1, "send": 1}
+    assert _registers(local["A"]) == ["m", "msg2", "msg3"]
+    assert _registers(local["B"]) == ["m", "msg0", "msg1"]
+    assert _registers(local["C"]) == ["m", "msg0", "msg1", "msg2", "msg3"]
+
+
+def test_conditions_fetch_bits_written_on_other_nodes():
+    qc = _circuit()
+    a, b, m = qc.qregs[0], qc.qregs[1], qc.cregs[0]
+    qc.measure(b[0], m[0])
+    qc.x(a[0]).c_if(m, 1)
+    qc.z(a[0]).c_if(m, 1)
+    local = qc.split_by_node()
+    assert [instruction.name for instruction, _, _ in local["B"].data[-2:]] == ["measure", "send"]
+    assert [instruction.name for instruction, _, _ in local["A"].data[-3:]] == ["recv", "x", "z"]
+
+
+def test_local_operation_across_nodes_is_rejected():
+    qc = _circuit()
+    qc.cx(qc.qregs[0][0], qc.qregs[1][0])
+    with pytest.raises(QiskitError):
+        qc.split_by_node()
+
+
+def test_transpile_keeps_local_primitives():
+    local = _circuit().transpile_by_node(basis_gates=["u", "cx"])
+    for circuit in local.values():
+        assert set(circuit.count_ops()) <= {"u", "cx", "measure", "epr_half", "send", "recv"}
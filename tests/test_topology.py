@@ -0,0 +1,55 @@
+import pytest
+from qiskit import QiskitError, QuantumRegister
+from qiskit.circuit.library import HGate
+
+from distributed_circuit import DistQuantumCircuit, NetworkTopology
+from distributed_circuit.instructions import EPRInstr
+
+
+def _circuit():
+    a, e, b = QuantumRegister(1, "a"), QuantumRegister(4, "e"), QuantumRegister(1, "b")
+    topology = NetworkTopology()
+    topology.add_node("A", [a[0]], [e[0], e[2]])
+    topology.add_node("B", [b[0]], [e[1], e[3]])
+    topology.add_link("A", "B", capacity=2)
+    qc = DistQuantumCircuit(a, e, b, topology=topology)
+    qc.epr(e[0], e[1])
+    qc.remote_cx(a[0], e[0], e[1], b[0])
+    qc.h(a[0])
+    return qc
+
+
+def test_index_follows_appends():
+    qc = _circuit()
+    index = qc.resource_index
+    assert index.epr_count("B", "A") == 1
+    assert index.link_load("A", "B") == 0.5
+    assert index.remote_ops("A") == 2
+    assert index.occupancy("A") == 2
+    assert index.occupancy("B") == 2
+
+    qc.topology.add_node("C")
+    with pytest.raises(QiskitError):
+        index.link_load("A", "C")
+
+    cpy = qc.copy()
+    cpy.epr(cpy.qubits[3], cpy.qubits[4])
+    assert cpy.resource_index.epr_count("A", "B") == 2
+    assert index.epr_count("A", "B") == 1
+
+
+def test_index_follows_data_changes():
+    qc = _circuit()
+    e = qc.qregs[1]
+    qc.data.insert(0, (EPRInstr(), [e[2], e[3]], []))
+    assert qc.resource_index.epr_count("A", "B") == 2
+    assert qc.resource_index.occupancy("A") == 3
+    qc.data.pop(0)
+    qc.data.pop(0)
+    assert qc.resource_index.epr_count("A", "B") == 0
+    assert qc.resource_index.remote_ops("B") == 1
+    assert qc.resource_index.occupancy("A") == 2
+    qc.data[0] = (HGate(), [e[0]], [])
+    assert qc.resource_index.remote_ops("B") == 0
+    assert qc.resource_index.occupancy("A") == 2
+    assert qc.resource_index.occupancy("B") == 0